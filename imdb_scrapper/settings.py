@@ -127,3 +127,6 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Profiles of scrape jobs started with --profile, one directory per job_id
+SCRAPER_PROFILE_DIR = BASE_DIR / 'profiles'
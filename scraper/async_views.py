@@ -0,0 +1,96 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from scraper.models import ScraperStatus
+from scraper.serializers import MovieLookupSerializer, MovieSerializer, ScraperStatusSerializer
+from scraper.views import lookup_querysets, lookup_results, movie_search_queryset, queue_missing_ids
+
+# Async counterparts of the read APIs in views.py. They run on the event
+# loop under ASGI and use Django's async ORM, so slow clients such as
+# progress pollers don't each hold a worker thread. Responses match the
+# DRF views.
+
+
+class AsyncMovieListView(View):
+    async def get(self, request):
+        query = request.GET.get('search', '')
+        per_page = int(request.GET.get('per_page', 10))
+        movies = movie_search_queryset(query)
+
+        count = await movies.acount()
+        paginator = Paginator(range(count), per_page)
+        page_number = request.GET.get('page', 1)
+        if page_number == 'last':
+            # Same shortcut as DRF's PageNumberPagination.last_page_strings
+            page_number = paginator.num_pages
+        try:
+            page = paginator.page(page_number)
+        except InvalidPage:
+            return JsonResponse({'detail': 'Invalid page.'}, status=404)
+
+        offset = (page.number - 1) * per_page
+        results = [
+            MovieSerializer(movie).data
+            async for movie in movies[offset:offset + per_page].aiterator()
+        ]
+        url = request.build_absolute_uri()
+        next_link = replace_query_param(url, 'page', page.next_page_number()) if page.has_next() else None
+        previous_link = None
+        if page.has_previous():
+            previous_number = page.previous_page_number()
+            previous_link = (
+                remove_query_param(url, 'page') if previous_number == 1
+                else replace_query_param(url, 'page', previous_number)
+            )
+        return JsonResponse({
+            'count': count,
+            'next': next_link,
+            'previous': previous_link,
+            'results': results,
+        })
+
+
+class AsyncScraperProgressView(View):
+    async def get(self, request, job_id):
+        try:
+            status_obj = await ScraperStatus.objects.aget(job_id=job_id)
+        except ScraperStatus.DoesNotExist:
+            return JsonResponse({'detail': 'No ScraperStatus matches the given query.'}, status=404)
+        return JsonResponse(ScraperStatusSerializer(status_obj).data)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncMovieLookupView(View):
+    async def post(self, request):
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'detail': 'JSON parse error.'}, status=400)
+        serializer = MovieLookupSerializer(data=payload)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        data = serializer.validated_data
+        titles = await self.lookup('title', data['titles'])
+        imdb_ids = await self.lookup('imdb_id', data['imdb_ids'])
+        response = {'titles': titles, 'imdb_ids': imdb_ids}
+
+        if data['scrape_missing']:
+            missing = [key for key, movie in imdb_ids.items() if movie is None]
+            response['job_id'] = await sync_to_async(queue_missing_ids)(missing)
+
+        return JsonResponse(response)
+
+    async def lookup(self, field, keys):
+        keys = list(dict.fromkeys(keys))
+        movies = []
+        for queryset in lookup_querysets(field, keys):
+            movies += [movie async for movie in queryset.aiterator()]
+        return lookup_results(field, keys, movies)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0004_yearstats_directorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='imdb_id',
+            field=models.CharField(db_index=True, max_length=16, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_movie_imdb_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scraperstatus',
+            name='profile_artifacts',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def populate_stats(apps, schema_editor):
+    # The summary tables start empty; fill them from the existing movies so
+    # incremental updates have correct buckets to adjust. Kept self-contained
+    # so later changes to scraper.stats don't alter this migration.
+    Movie = apps.get_model('scraper', 'Movie')
+    YearStats = apps.get_model('scraper', 'YearStats')
+    DirectorStats = apps.get_model('scraper', 'DirectorStats')
+
+    year_rows = (
+        Movie.objects.filter(year__isnull=False)
+        .values('year')
+        .annotate(movie_count=Count('id'), rated_count=Count('rating'), rating_sum=Sum('rating'))
+    )
+    YearStats.objects.bulk_create([
+        YearStats(
+            year=row['year'],
+            movie_count=row['movie_count'],
+            rated_count=row['rated_count'],
+            rating_sum=row['rating_sum'] or 0,
+        )
+        for row in year_rows
+    ])
+
+    directors = Counter()
+    for value in Movie.objects.exclude(directors__isnull=True).values_list('directors', flat=True).iterator():
+        directors.update(name.strip()[:255] for name in value.split(',') if name.strip())
+    DirectorStats.objects.bulk_create(
+        [DirectorStats(name=name, movie_count=n) for name, n in directors.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_scraperstatus_profile_artifacts'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
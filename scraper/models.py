@@ -4,6 +4,7 @@ from django.db import models
 # Create your models here.
 class Movie(models.Model):
     title = models.CharField(max_length=255,unique=True)
+    imdb_id = models.CharField(max_length=16, null=True, unique=True)
     year = models.IntegerField(null=True)
     rating = models.DecimalField(max_digits=3, decimal_places=1, null=True)
     directors = models.TextField(null=True)
@@ -20,6 +21,8 @@ class ScraperStatus(models.Model):
     job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     started_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_type = models.CharField(max_length=20, blank=True, default='')
+    search_value = models.TextField(blank=True, default='')
     total_movies = models.IntegerField(default=0)
     scraped_movies = models.IntegerField(default=0)
     status = models.CharField(max_length=20, choices=[
@@ -29,7 +32,33 @@ class ScraperStatus(models.Model):
         ("error", "Error")
     ], default="pending")
     error_message = models.TextField(blank=True, null=True)
+    profile_artifacts = models.JSONField(default=list, blank=True)
 
 
     def __str__(self):
         return f"Job {self.job_id} - {self.status}"
+
+
+class YearStats(models.Model):
+    year = models.IntegerField(unique=True)
+    movie_count = models.IntegerField(default=0)
+    rated_count = models.IntegerField(default=0)
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average_rating(self):
+        if not self.rated_count:
+            return None
+        return round(self.rating_sum / self.rated_count, 2)
+
+    def __str__(self):
+        return f"{self.year}: {self.movie_count} movies"
+
+class DirectorStats(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    movie_count = models.IntegerField(default=0, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.movie_count} movies"
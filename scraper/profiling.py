@@ -0,0 +1,135 @@
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+PROFILE_CHOICES = ['cprofile', 'sampling']
+
+# tracemalloc is process-wide and jobs started from the API run as threads
+# of the web server, so it stays on while any profiled job is active.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_jobs = 0
+_tracemalloc_started = False
+
+
+def _start_tracemalloc():
+    global _tracemalloc_jobs, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_jobs += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_jobs, _tracemalloc_started
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracemalloc_jobs -= 1
+        # Leave tracing alone if it was enabled outside (e.g. PYTHONTRACEMALLOC)
+        if _tracemalloc_jobs == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+        return snapshot
+
+
+class JobProfiler:
+    """Profiles one scrape job and writes its artifacts to
+    ``SCRAPER_PROFILE_DIR/<job_id>/``.
+
+    The event-loop thread runs under cProfile, or under pyinstrument in
+    ``sampling`` mode. Work handed to the thread pool goes through
+    ``profile_call`` so parsing shows up as well. tracemalloc records
+    allocations from the whole process, so the memory report also covers
+    other jobs and requests running at the same time.
+    """
+
+    def __init__(self, job_id, mode='cprofile', top=25):
+        self.job_id = str(job_id)
+        self.mode = mode
+        self.top = top
+        self.directory = Path(settings.SCRAPER_PROFILE_DIR) / self.job_id
+        self.cpu = None
+        self.sampler = None
+        self.thread_profiles = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        _start_tracemalloc()
+        if self.mode == 'sampling':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument is not installed, falling back to cProfile")
+            else:
+                self.sampler = Profiler()
+                self.sampler.start()
+                return
+        self.cpu = cProfile.Profile()
+        try:
+            self.cpu.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile per process; another
+            # profiled job already has it, so only worker calls get profiled.
+            logger.warning("Another profiler is active, skipping the event-loop CPU profile")
+            self.cpu = None
+
+    def profile_call(self, func, *args):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+: an active cProfile already covers every thread
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            profiler.disable()
+            with self.lock:
+                self.thread_profiles.append(profiler)
+
+    def stop(self):
+        """Stop profiling, write the artifacts and return their paths
+        relative to ``SCRAPER_PROFILE_DIR``."""
+        try:
+            if self.cpu:
+                self.cpu.disable()
+            if self.sampler:
+                self.sampler.stop()
+        finally:
+            snapshot = _stop_tracemalloc()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        artifacts = []
+
+        profiles = [p for p in [self.cpu, *self.thread_profiles] if p]
+        if profiles:
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(self.directory / 'cpu.prof')
+            report = io.StringIO()
+            pstats.Stats(str(self.directory / 'cpu.prof'), stream=report).sort_stats('cumulative').print_stats(self.top)
+            (self.directory / 'cpu.txt').write_text(report.getvalue())
+            artifacts += ['cpu.prof', 'cpu.txt']
+
+        if self.sampler:
+            (self.directory / 'sampling.html').write_text(self.sampler.output_html())
+            artifacts.append('sampling.html')
+
+        if snapshot:
+            lines = [
+                f"Top {self.top} allocation sites by size, process-wide: includes any",
+                "other jobs and requests that ran while this job was profiled.",
+                "",
+            ]
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                lines.append(str(stat))
+            (self.directory / 'memory.txt').write_text('\n'.join(lines) + '\n')
+            artifacts.append('memory.txt')
+
+        return [f"{self.job_id}/{name}" for name in artifacts]
@@ -1,19 +1,53 @@
 
 
 from rest_framework import serializers
-from scraper.models import Movie, ScraperStatus
+from scraper.models import DirectorStats, Movie, ScraperStatus, YearStats
+from scraper.profiling import PROFILE_CHOICES
+
+LOOKUP_MAX_KEYS = 1000
+STATS_MAX_TOP = 100
 
 class MovieSerializer(serializers.ModelSerializer):
     class Meta:
         model = Movie
-        fields = ['id', 'title', 'year', 'rating', 'directors', 'cast', 'plot']
+        fields = ['id', 'imdb_id', 'title', 'year', 'rating', 'directors', 'cast', 'plot']
 
 class ScraperStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScraperStatus
-        fields = ['job_id', 'status', 'scraped_movies', 'total_movies', 'error_message', 'updated_at']
+        fields = ['job_id', 'status', 'scraped_movies', 'total_movies', 'error_message', 'profile_artifacts', 'updated_at']
 
 class ScraperTriggerSerializer(serializers.Serializer):
     type = serializers.ChoiceField(choices=['genre', 'keyword'])
     value = serializers.CharField()
     limit = serializers.IntegerField(default=50, required=False)
+    profile = serializers.ChoiceField(choices=PROFILE_CHOICES, required=False, allow_null=True, default=None)
+
+class MovieLookupSerializer(serializers.Serializer):
+    # Titles are used verbatim as response keys, so keep the client's whitespace
+    titles = serializers.ListField(child=serializers.CharField(max_length=255, trim_whitespace=False), required=False, default=list)
+    imdb_ids = serializers.ListField(child=serializers.RegexField(r'^tt\d+$'), required=False, default=list)
+    scrape_missing = serializers.BooleanField(default=False, required=False)
+
+    def validate(self, data):
+        total = len(data['titles']) + len(data['imdb_ids'])
+        if not total:
+            raise serializers.ValidationError("Provide at least one of 'titles' or 'imdb_ids'.")
+        if total > LOOKUP_MAX_KEYS:
+            raise serializers.ValidationError(f"At most {LOOKUP_MAX_KEYS} titles and IMDb ids per request.")
+        return data
+
+class YearStatsSerializer(serializers.ModelSerializer):
+    average_rating = serializers.DecimalField(max_digits=4, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = YearStats
+        fields = ['year', 'movie_count', 'average_rating']
+
+class StatsQuerySerializer(serializers.Serializer):
+    top = serializers.IntegerField(default=10, min_value=0, max_value=STATS_MAX_TOP)
+
+class DirectorStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DirectorStats
+        fields = ['name', 'movie_count']
@@ -0,0 +1,112 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from scraper.models import DirectorStats, Movie, YearStats
+
+
+def split_directors(directors):
+    if not directors:
+        return []
+    return [name.strip()[:255] for name in directors.split(',') if name.strip()]
+
+
+class StatsDelta:
+    """Per-bucket changes collected from one write batch.
+
+    ``add(movie)`` counts a row into the summary tables and
+    ``remove(movie)`` takes it back out, so an updated row is recorded
+    as ``remove(old)`` followed by ``add(new)``.
+    """
+
+    def __init__(self):
+        # year -> [movie_count, rated_count, rating_sum]
+        self.years = defaultdict(lambda: [0, 0, Decimal(0)])
+        self.directors = Counter()
+
+    def add(self, movie, sign=1):
+        if movie.year not in (None, ''):
+            bucket = self.years[int(movie.year)]
+            bucket[0] += sign
+            if movie.rating is not None:
+                bucket[1] += sign
+                bucket[2] += sign * Decimal(str(movie.rating))
+        for name in split_directors(movie.directors):
+            self.directors[name] += sign
+
+    def remove(self, movie):
+        self.add(movie, sign=-1)
+
+    def __bool__(self):
+        return any(any(v) for v in self.years.values()) or any(self.directors.values())
+
+
+def apply_stats_delta(delta):
+    """Apply a ``StatsDelta`` with one UPDATE per touched bucket."""
+    years = {year: v for year, v in delta.years.items() if any(v)}
+    directors = {name: n for name, n in delta.directors.items() if n}
+
+    with transaction.atomic():
+        if years:
+            YearStats.objects.bulk_create(
+                [YearStats(year=year) for year in years], ignore_conflicts=True
+            )
+            for year, (movie_count, rated_count, rating_sum) in years.items():
+                YearStats.objects.filter(year=year).update(
+                    movie_count=F('movie_count') + movie_count,
+                    rated_count=F('rated_count') + rated_count,
+                    rating_sum=F('rating_sum') + rating_sum,
+                )
+            YearStats.objects.filter(year__in=years, movie_count__lte=0).delete()
+
+        if directors:
+            DirectorStats.objects.bulk_create(
+                [DirectorStats(name=name) for name in directors], ignore_conflicts=True
+            )
+            for name, movie_count in directors.items():
+                DirectorStats.objects.filter(name=name).update(
+                    movie_count=F('movie_count') + movie_count
+                )
+            DirectorStats.objects.filter(name__in=directors, movie_count__lte=0).delete()
+
+
+def rebuild_stats(movie_model=Movie, year_stats_model=YearStats, director_stats_model=DirectorStats):
+    """Recompute the summary tables from the full ``Movie`` table.
+
+    The models can be swapped for historical ones so migrations can reuse it.
+    """
+    with transaction.atomic():
+        # Clearing the tables first takes the write lock before Movie is
+        # read, so a scraper batch can't commit between the read and the insert.
+        year_stats_model.objects.all().delete()
+        director_stats_model.objects.all().delete()
+
+        year_rows = (
+            movie_model.objects.filter(year__isnull=False)
+            .values('year')
+            .annotate(
+                movie_count=Count('id'),
+                rated_count=Count('rating'),
+                rating_sum=Sum('rating'),
+            )
+        )
+        directors = Counter()
+        for value in movie_model.objects.exclude(directors__isnull=True).values_list('directors', flat=True).iterator():
+            directors.update(split_directors(value))
+
+        year_stats_model.objects.bulk_create([
+            year_stats_model(
+                year=row['year'],
+                movie_count=row['movie_count'],
+                rated_count=row['rated_count'],
+                rating_sum=row['rating_sum'] or 0,
+            )
+            for row in year_rows
+        ])
+        director_stats_model.objects.bulk_create(
+            [director_stats_model(name=name, movie_count=n) for name, n in directors.items()],
+            batch_size=500,
+        )
+    return year_stats_model.objects.count(), director_stats_model.objects.count()
@@ -1,3 +1,260 @@
-from django.test import TestCase
+import tempfile
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from scraper.models import DirectorStats, Movie, ScraperStatus, YearStats
+from scraper.profiling import JobProfiler
+from scraper.stats import rebuild_stats
+from scripts.management.commands.scrapper import Command
+
+
+def stats_snapshot():
+    years = {
+        y.year: (y.movie_count, y.rated_count, y.rating_sum)
+        for y in YearStats.objects.all()
+    }
+    directors = dict(DirectorStats.objects.values_list('name', 'movie_count'))
+    return years, directors
+
+
+class IncrementalStatsTests(TestCase):
+    def write(self, *movies):
+        # Scraped values arrive as strings/floats, as in scrape_movies()
+        async_to_sync(Command().bulk_insert_movies)([Movie(**m) for m in movies])
+
+    def assertMatchesRebuild(self):
+        incremental = stats_snapshot()
+        rebuild_stats()
+        self.assertEqual(incremental, stats_snapshot())
+        return incremental
+
+    def test_insert(self):
+        self.write(
+            {'title': 'A', 'year': '2008', 'rating': 9.0, 'directors': 'X, Y'},
+            {'title': 'B', 'year': '2008', 'rating': None, 'directors': 'X'},
+            {'title': 'C', 'year': None, 'rating': 7.5, 'directors': None},
+        )
+        years, directors = self.assertMatchesRebuild()
+        self.assertEqual(years, {2008: (2, 1, Decimal('9.0'))})
+        self.assertEqual(directors, {'X': 2, 'Y': 1})
+
+    def test_update_moves_buckets(self):
+        self.write(
+            {'title': 'A', 'year': '2008', 'rating': 9.0, 'directors': 'X, Y'},
+            {'title': 'B', 'year': '2009', 'rating': 6.0, 'directors': 'Y'},
+        )
+        self.write({'title': 'A', 'year': '2009', 'rating': 8.0, 'directors': 'Z'})
+        years, directors = self.assertMatchesRebuild()
+        self.assertEqual(years, {2009: (2, 2, Decimal('14.0'))})
+        self.assertEqual(directors, {'Y': 1, 'Z': 1})
+
+    def test_update_clears_rating(self):
+        self.write({'title': 'A', 'year': '2008', 'rating': 9.0, 'directors': 'X'})
+        self.write({'title': 'A', 'year': '2008', 'rating': None, 'directors': 'X'})
+        years, _ = self.assertMatchesRebuild()
+        self.assertEqual(years, {2008: (1, 0, Decimal('0.0'))})
+
+    def test_duplicate_title_in_batch(self):
+        self.write(
+            {'title': 'A', 'year': '2008', 'rating': 9.0, 'directors': 'X'},
+            {'title': 'A', 'year': '2010', 'rating': 5.0, 'directors': 'Y'},
+        )
+        years, directors = self.assertMatchesRebuild()
+        self.assertEqual(years, {2010: (1, 1, Decimal('5.0'))})
+        self.assertEqual(directors, {'Y': 1})
+        self.assertEqual(Movie.objects.get(title='A').year, 2010)
+
+    def test_row_without_title_is_skipped(self):
+        self.write(
+            {'title': None, 'year': '2008', 'rating': 9.0, 'directors': 'X'},
+            {'title': 'B', 'year': '2008', 'rating': 7.0, 'directors': 'Y'},
+        )
+        years, directors = self.assertMatchesRebuild()
+        self.assertEqual(list(Movie.objects.values_list('title', flat=True)), ['B'])
+        self.assertEqual(directors, {'Y': 1})
+
+    def test_rename_keyed_on_imdb_id(self):
+        self.write({'title': 'Old', 'imdb_id': 'tt1', 'year': '2008', 'rating': 9.0, 'directors': 'X'})
+        self.write({'title': 'New', 'imdb_id': 'tt1', 'year': '2008', 'rating': 8.0, 'directors': 'X'})
+        years, directors = self.assertMatchesRebuild()
+        self.assertEqual(list(Movie.objects.values_list('title', 'imdb_id')), [('New', 'tt1')])
+        self.assertEqual(years, {2008: (1, 1, Decimal('8.0'))})
+        self.assertEqual(directors, {'X': 1})
+
+    def test_rename_does_not_merge_movies(self):
+        self.write({'title': 'B', 'imdb_id': 'tt1', 'year': '2001', 'rating': 5.0})
+        self.write(
+            {'title': 'A', 'imdb_id': 'tt1', 'year': '2001', 'rating': 6.0},
+            {'title': 'B', 'imdb_id': 'tt2', 'year': '2002', 'rating': 7.0},
+        )
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            sorted(Movie.objects.values_list('title', 'imdb_id', 'year')),
+            [('A', 'tt1', 2001), ('B', 'tt2', 2002)],
+        )
+
+    def test_rename_frees_title_for_new_movie(self):
+        self.write({'title': 'A', 'imdb_id': 'tt1', 'year': '2001'})
+        self.write(
+            {'title': 'B', 'imdb_id': 'tt1', 'year': '2001'},
+            {'title': 'A', 'imdb_id': 'tt2', 'year': '2002'},
+        )
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            sorted(Movie.objects.values_list('title', 'imdb_id')),
+            [('A', 'tt2'), ('B', 'tt1')],
+        )
+
+    def test_chained_renames(self):
+        self.write(
+            {'title': 'A', 'imdb_id': 'tt1', 'year': '2001'},
+            {'title': 'B', 'imdb_id': 'tt2', 'year': '2002'},
+        )
+        self.write(
+            {'title': 'C', 'imdb_id': 'tt2', 'year': '2002'},
+            {'title': 'B', 'imdb_id': 'tt1', 'year': '2001'},
+        )
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            sorted(Movie.objects.values_list('title', 'imdb_id')),
+            [('B', 'tt1'), ('C', 'tt2')],
+        )
+
+
+class MovieLookupAPITests(TestCase):
+    def lookup(self, **body):
+        return self.client.post('/scraper/movies/lookup/', body, content_type='application/json')
+
+    def test_resolves_titles_and_ids(self):
+        Movie.objects.create(title='A', imdb_id='tt1')
+        data = self.lookup(titles=['A', 'B'], imdb_ids=['tt1', 'tt2']).json()
+        self.assertEqual(data['titles']['A']['imdb_id'], 'tt1')
+        self.assertIsNone(data['titles']['B'])
+        self.assertEqual(data['imdb_ids']['tt1']['title'], 'A')
+        self.assertIsNone(data['imdb_ids']['tt2'])
+
+    @mock.patch('scraper.views.Thread')
+    def test_scrape_missing_skips_queued_ids(self, thread):
+        first = self.lookup(imdb_ids=['tt1', 'tt2'], scrape_missing=True).json()
+        self.assertIsNotNone(first['job_id'])
+        self.assertIsNone(self.lookup(imdb_ids=['tt2'], scrape_missing=True).json()['job_id'])
+
+        third = self.lookup(imdb_ids=['tt2', 'tt3'], scrape_missing=True).json()
+        self.assertEqual(ScraperStatus.objects.get(job_id=third['job_id']).search_value, 'tt3')
+        self.assertEqual(thread.call_count, 2)
+
+    @mock.patch('scraper.views.Thread')
+    def test_stale_job_does_not_block_queueing(self, thread):
+        stale = ScraperStatus.objects.create(status='running', search_type='ids', search_value='tt1')
+        ScraperStatus.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(hours=2))
+        self.assertIsNotNone(self.lookup(imdb_ids=['tt1'], scrape_missing=True).json()['job_id'])
+
+    def test_title_keys_are_not_trimmed(self):
+        Movie.objects.create(title='A')
+        data = self.lookup(titles=[' A', 'A']).json()
+        self.assertEqual(data['titles'], {' A': None, 'A': mock.ANY})
+
+
+class MovieStatsAPITests(TestCase):
+    def setUp(self):
+        DirectorStats.objects.bulk_create(
+            [DirectorStats(name=f'D{i}', movie_count=i) for i in range(1, 4)]
+        )
+
+    def test_top_limits_directors(self):
+        response = self.client.get('/scraper/stats/?top=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d['name'] for d in response.json()['top_directors']], ['D3', 'D2'])
+
+    def test_invalid_top(self):
+        for top in ('-1', 'abc', '101'):
+            response = self.client.get(f'/scraper/stats/?top={top}')
+            self.assertEqual(response.status_code, 400)
+
+
+class AsyncViewsTests(TestCase):
+    def test_list_matches_sync_view(self):
+        Movie.objects.bulk_create([Movie(title=f'M{i}', year=2000 + i) for i in range(5)])
+        for query in ('?per_page=2', '?per_page=2&page=2', '?per_page=2&page=last', '?search=M3'):
+            sync = self.client.get(f'/scraper/movies/{query}').json()
+            async_ = self.client.get(f'/scraper/async/movies/{query}').json()
+            for data in (sync, async_):
+                for key in ('next', 'previous'):
+                    if data[key]:
+                        data[key] = data[key].replace('/async', '')
+            self.assertEqual(sync, async_)
+
+    def test_lookup_matches_sync_view(self):
+        Movie.objects.create(title='A', imdb_id='tt1', year=2001, rating=7.5)
+        Movie.objects.create(title='B', imdb_id='tt2')
+        bodies = [
+            {'titles': ['A', 'missing', ' A'], 'imdb_ids': ['tt2', 'tt9']},
+            {'imdb_ids': ['tt1', 'tt1']},
+        ]
+        for body in bodies:
+            sync = self.client.post('/scraper/movies/lookup/', body, content_type='application/json')
+            async_ = self.client.post('/scraper/async/movies/lookup/', body, content_type='application/json')
+            self.assertEqual(async_.status_code, 200)
+            self.assertEqual(sync.json(), async_.json())
+
+    def test_lookup_rejects_bad_input_like_sync_view(self):
+        for body in ({}, {'imdb_ids': ['nm123']}, {'titles': ['x'] * 1001}):
+            sync = self.client.post('/scraper/movies/lookup/', body, content_type='application/json')
+            async_ = self.client.post('/scraper/async/movies/lookup/', body, content_type='application/json')
+            self.assertEqual((sync.status_code, async_.status_code), (400, 400))
+            self.assertEqual(sync.json(), async_.json())
+
+    def test_progress_not_found(self):
+        response = self.client.get('/scraper/async/progress/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ProfileDirMixin:
+    def setUp(self):
+        profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        override = override_settings(SCRAPER_PROFILE_DIR=profile_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class JobProfilerTests(ProfileDirMixin, TestCase):
+    def test_overlapping_jobs_share_tracemalloc(self):
+        first, second = JobProfiler('job-1'), JobProfiler('job-2')
+        first.start()
+        second.start()
+        self.assertIn('job-1/memory.txt', first.stop())
+        self.assertTrue(tracemalloc.is_tracing())
+        self.assertIn('job-2/memory.txt', second.stop())
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+# The command runs the ORM from asyncio.run()'s worker thread, which needs
+# committed data rather than TestCase's wrapping transaction.
+class ProfiledScrapeTests(ProfileDirMixin, TransactionTestCase):
+    @mock.patch('scripts.management.commands.scrapper.requests.get')
+    def test_profile_failure_keeps_job_completed(self, get):
+        get.return_value = mock.Mock(text='<h1 data-testid="hero__pageTitle">Movie</h1>')
+        with mock.patch.object(JobProfiler, 'stop', side_effect=OSError('disk full')):
+            call_command('scrapper', type='ids', value='tt1', limit=1, profile='cprofile')
+        status = ScraperStatus.objects.get()
+        self.assertEqual(status.status, 'completed')
+        self.assertEqual(status.profile_artifacts, [])
+
+    @mock.patch('scripts.management.commands.scrapper.requests.get')
+    def test_artifacts_saved_with_completed_status(self, get):
+        get.return_value = mock.Mock(text='<h1 data-testid="hero__pageTitle">Movie</h1>')
+        call_command('scrapper', type='ids', value='tt1', limit=1, profile='cprofile')
+        status = ScraperStatus.objects.get()
+        self.assertEqual(status.status, 'completed')
+        self.assertEqual(
+            sorted(a.split('/')[1] for a in status.profile_artifacts),
+            ['cpu.prof', 'cpu.txt', 'memory.txt'],
+        )
@@ -1,9 +1,15 @@
 
 from django.urls import path
-from .views import MovieListAPIView, TriggerScraperAPIView, ScraperProgressView
+from .async_views import AsyncMovieListView, AsyncMovieLookupView, AsyncScraperProgressView
+from .views import MovieListAPIView, MovieLookupAPIView, MovieStatsAPIView, TriggerScraperAPIView, ScraperProgressView
 
 urlpatterns = [
     path('start/', TriggerScraperAPIView.as_view(), name='start-scraper'),
     path('progress/<uuid:job_id>/', ScraperProgressView.as_view(), name='scraper-progress'),
     path('movies/', MovieListAPIView.as_view(), name='scraper-movie-list'),
+    path('movies/lookup/', MovieLookupAPIView.as_view(), name='scraper-movie-lookup'),
+    path('async/progress/<uuid:job_id>/', AsyncScraperProgressView.as_view(), name='async-scraper-progress'),
+    path('async/movies/', AsyncMovieListView.as_view(), name='async-scraper-movie-list'),
+    path('async/movies/lookup/', AsyncMovieLookupView.as_view(), name='async-scraper-movie-lookup'),
+    path('stats/', MovieStatsAPIView.as_view(), name='scraper-movie-stats'),
 ]
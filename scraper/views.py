@@ -5,32 +5,109 @@ from django.utils.decorators import method_decorator
 import uuid
 from django.http import JsonResponse
 from django.views import View
-from threading import Thread
+from datetime import timedelta
+from threading import Lock, Thread
 from django.core import management
 from scraper.models import ScraperStatus
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from scraper.models import Movie
-from scraper.serializers import MovieSerializer, ScraperStatusSerializer, ScraperTriggerSerializer
+from scraper.models import DirectorStats, Movie, YearStats
+from scraper.serializers import (
+    DirectorStatsSerializer, MovieLookupSerializer, MovieSerializer, ScraperStatusSerializer, ScraperTriggerSerializer,
+    StatsQuerySerializer, YearStatsSerializer
+)
 from django.db.models import Q
+from django.utils import timezone
 from rest_framework import status as drf_status
 
+# Keeps each IN (...) below SQLite's default bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+ACTIVE_STATUSES = ["pending", "running"]
+# A job killed with its process stays 'running' forever; past this age it no
+# longer blocks its ids from being queued again.
+ACTIVE_JOB_TIMEOUT = timedelta(hours=1)
+# Only serializes lookups within one process; separate workers can still
+# queue the same id at the same moment.
+queue_lock = Lock()
+
+
+def start_scraper_job(search_type, search_value, limit, profile=None):
+    status_obj = ScraperStatus.objects.create(
+        status="pending",
+        search_type=search_type,
+        search_value=search_value,
+        total_movies=limit
+    )
+    job_id = str(status_obj.job_id)
+
+    def run_scraper():
+        try:
+            management.call_command(
+                'scrapper',
+                type=search_type,
+                value=search_value,
+                limit=limit,
+                job_id=job_id,
+                profile=profile
+            )
+        except Exception as e:
+            status_obj.status = "error"
+            status_obj.error_message = str(e)
+            status_obj.save(update_fields=["status", "error_message"])
+
+    Thread(target=run_scraper).start()
+    return job_id
+
+
+def queue_missing_ids(imdb_ids):
+    # Skip ids that a pending or running job already covers, so clients that
+    # retry a lookup don't start duplicate scrapes.
+    with queue_lock:
+        active = ScraperStatus.objects.filter(
+            search_type='ids',
+            status__in=ACTIVE_STATUSES,
+            updated_at__gte=timezone.now() - ACTIVE_JOB_TIMEOUT,
+        ).values_list('search_value', flat=True)
+        queued = {i for value in active for i in value.split(',')}
+        missing = [i for i in imdb_ids if i not in queued]
+        if not missing:
+            return None
+        return start_scraper_job('ids', ','.join(missing), len(missing))
+
+
+def lookup_querysets(field, keys):
+    # One IN (...) query per chunk of keys on an indexed column; shared by
+    # the sync and async lookup views.
+    for i in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        yield Movie.objects.filter(**{f'{field}__in': keys[i:i + LOOKUP_CHUNK_SIZE]})
+
+
+def lookup_results(field, keys, movies):
+    found = {getattr(movie, field): MovieSerializer(movie).data for movie in movies}
+    return {key: found.get(key) for key in keys}
+
+
+def movie_search_queryset(query):
+    movies = Movie.objects.all().order_by('-id')
+
+    if query:
+        movies = movies.filter(
+            Q(title__icontains=query) |
+            Q(directors__icontains=query) |
+            Q(cast__icontains=query) |
+            Q(year__icontains=query)
+        )
+    return movies
+
+
 class MovieListAPIView(APIView):
     def get(self, request):
         query = request.GET.get('search', '')
         per_page = int(request.GET.get('per_page', 10))
 
-        movies = Movie.objects.all().order_by('-id')
-
-        if query:
-            movies = movies.filter(
-                Q(title__icontains=query) |
-                Q(directors__icontains=query) |
-                Q(cast__icontains=query) |
-                Q(year__icontains=query)
-            )
+        movies = movie_search_queryset(query)
 
         paginator = PageNumberPagination()
         paginator.page_size = per_page
@@ -45,6 +122,48 @@ class ScraperProgressView(APIView):
         serializer = ScraperStatusSerializer(status_obj)
         return Response(serializer.data)
 
+class MovieLookupAPIView(APIView):
+    # Resolves many titles / IMDb ids with chunked IN (...) queries on the
+    # indexed title and imdb_id columns instead of one search per key.
+    def post(self, request):
+        serializer = MovieLookupSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=drf_status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        titles = self.lookup('title', data['titles'])
+        imdb_ids = self.lookup('imdb_id', data['imdb_ids'])
+        response = {'titles': titles, 'imdb_ids': imdb_ids}
+
+        if data['scrape_missing']:
+            # Only ids can be queued: a bare title does not identify an IMDb page
+            missing = [key for key, movie in imdb_ids.items() if movie is None]
+            response['job_id'] = queue_missing_ids(missing)
+
+        return Response(response)
+
+    def lookup(self, field, keys):
+        keys = list(dict.fromkeys(keys))
+        movies = [movie for queryset in lookup_querysets(field, keys) for movie in queryset]
+        return lookup_results(field, keys, movies)
+
+
+class MovieStatsAPIView(APIView):
+    # Served from the summary tables kept up to date by the scraper, so the
+    # cost depends on the number of years/directors rather than movies.
+    def get(self, request):
+        serializer = StatsQuerySerializer(data=request.GET)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=drf_status.HTTP_400_BAD_REQUEST)
+
+        top = serializer.validated_data['top']
+        years = YearStats.objects.order_by('year')
+        directors = DirectorStats.objects.order_by('-movie_count', 'name')[:top]
+        return Response({
+            'years': YearStatsSerializer(years, many=True).data,
+            'top_directors': DirectorStatsSerializer(directors, many=True).data,
+        })
+
 class TriggerScraperAPIView(APIView):
     def post(self, request):
         serializer = ScraperTriggerSerializer(data=request.data)
@@ -56,26 +175,6 @@ class TriggerScraperAPIView(APIView):
         search_value = data['value']
         limit = data.get('limit', 50)
 
-        status_obj = ScraperStatus.objects.create(
-            status="pending",
-            total_movies=limit
-        )
-        job_id = str(status_obj.job_id)
-
-        def run_scraper():
-            try:
-                management.call_command(
-                    'scrapper',
-                    type=search_type,
-                    value=search_value,
-                    limit=limit,
-                    job_id=job_id
-                )
-            except Exception as e:
-                status_obj.status = "error"
-                status_obj.error_message = str(e)
-                status_obj.save(update_fields=["status", "error_message"])
-
-        Thread(target=run_scraper).start()
+        job_id = start_scraper_job(search_type, search_value, limit, profile=data.get('profile'))
 
         return Response({"status": "started", "job_id": job_id}, status=drf_status.HTTP_202_ACCEPTED)
@@ -0,0 +1,81 @@
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+
+from scraper.models import Movie, ScraperStatus
+
+
+class Command(BaseCommand):
+    help = 'Load-tests the sync (DRF) and async read APIs through the ASGI handler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=200,
+            help='Number of requests in flight at once'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Total requests per endpoint'
+        )
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        total = options['requests']
+
+        status_obj = ScraperStatus.objects.create(status="running")
+        titles = list(Movie.objects.values_list('title', flat=True)[:100])
+        lookup_body = {'titles': titles or ['missing']}
+        job = status_obj.job_id
+        endpoints = [
+            ('list', 'get', '/scraper/movies/?per_page=10', '/scraper/async/movies/?per_page=10', None),
+            ('progress', 'get', f'/scraper/progress/{job}/', f'/scraper/async/progress/{job}/', None),
+            ('lookup', 'post', '/scraper/movies/lookup/', '/scraper/async/movies/lookup/', lookup_body),
+        ]
+
+        self.stdout.write(f"{total} requests per endpoint, concurrency {concurrency}")
+        self.stdout.write(f"{'endpoint':<10}{'view':<7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        try:
+            for name, method, sync_url, async_url, body in endpoints:
+                for view, url in (('sync', sync_url), ('async', async_url)):
+                    rps, p50, p95, errors = asyncio.run(
+                        self.run_load(method, url, body, total, concurrency)
+                    )
+                    self.stdout.write(f"{name:<10}{view:<7}{rps:>10.1f}{p50:>10.1f}{p95:>10.1f}{errors:>8}")
+        finally:
+            status_obj.delete()
+
+    async def run_load(self, method, url, body, total, concurrency):
+        # AsyncClient goes through Django's ASGIHandler, so sync views are
+        # dispatched to a thread exactly as under a real ASGI server.
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def one_request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                if method == 'post':
+                    response = await client.post(url, body, content_type='application/json')
+                else:
+                    response = await client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        return total / elapsed, statistics.median(latencies), p95, errors
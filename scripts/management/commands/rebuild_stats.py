@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from scraper.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-year and per-director summary tables from the Movie table'
+
+    def handle(self, *args, **options):
+        year_buckets, director_buckets = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats: {year_buckets} year buckets, {director_buckets} directors"
+        ))
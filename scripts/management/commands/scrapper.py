@@ -6,6 +6,8 @@ import sys
 import requests
 from bs4 import BeautifulSoup
 from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from playwright.async_api import async_playwright,TimeoutError, Error as PlaywrightError
 import math
 from asgiref.sync import sync_to_async
@@ -15,12 +17,19 @@ from scraper.models import ScraperStatus
 import uuid
 
 from scraper.models import Movie
+from scraper.profiling import PROFILE_CHOICES, JobProfiler
+from scraper.stats import StatsDelta, apply_stats_delta
 HEADERS = {'User-Agent': 'Mozilla/5.0'}
 logger = logging.getLogger(__name__)
 IMDB_PAGE_SIZE = 50
-SEARCH_CHOICES = ['genre', 'keyword']
+SEARCH_CHOICES = ['genre', 'keyword', 'ids']
+IMDB_ID_RE = re.compile(r'/title/(tt\d+)')
 BATCH_SIZE = 2
 
+
+class ConcurrentInsert(Exception):
+    """Another job inserted one of the batch's titles or IMDb ids after it was read."""
+
 class Command(BaseCommand):
     help = 'Scrapes IMDb movies based on genre or keyword'
 
@@ -50,6 +59,20 @@ class Command(BaseCommand):
             required=False,
             help='Job UUID for progress tracking'
         )
+        parser.add_argument(
+            '--profile',
+            type=str,
+            nargs='?',
+            const='cprofile',
+            choices=PROFILE_CHOICES,
+            help='Profile the job (cprofile, or sampling with pyinstrument) and save the artifacts under SCRAPER_PROFILE_DIR/<job_id>/'
+        )
+        parser.add_argument(
+            '--profile-top',
+            type=int,
+            default=25,
+            help='Number of entries in the CPU and memory profile reports'
+        )
 
     def handle(self, *args, **options):
         search_type = options['type']
@@ -62,7 +85,7 @@ class Command(BaseCommand):
             except ScraperStatus.DoesNotExist:
                 raise CommandError(f"Job with id {job_id} does not exist.")
         else:
-            status = ScraperStatus.objects.create()
+            status = ScraperStatus.objects.create(search_type=search_type, search_value=search_value)
         status.status = 'running'
         status.save(update_fields=["status"])
 
@@ -72,14 +95,42 @@ class Command(BaseCommand):
             status.save(update_fields=["status", "error_message"])
             raise CommandError(status.error_message)
 
+        self.profiler = None
+        if options.get('profile'):
+            self.profiler = JobProfiler(status.job_id, mode=options['profile'], top=options.get('profile_top', 25))
+
         print(f"Scraping IMDb using {search_type}: '{search_value}', limit: {limit}")
         try:
+            if self.profiler:
+                self.profiler.start()
             asyncio.run(self.scrape_movies(search_type, search_value, limit, status))
         except Exception as e:
             status.status = 'error'
             status.error_message = f"An error occurred: {e}"
             status.save(update_fields=["status", "error_message"])
             raise
+        finally:
+            # Normally already done with the final status update; this covers
+            # jobs that failed or stopped early.
+            artifacts = self.finish_profiling()
+            if artifacts is not None:
+                status.profile_artifacts = artifacts
+                status.save(update_fields=["profile_artifacts"])
+
+    def finish_profiling(self):
+        """Stop the profiler once and return its artifacts, or None if the
+        job isn't profiled or was already finished. Failing to write the
+        artifacts is logged rather than allowed to fail the job."""
+        profiler, self.profiler = self.profiler, None
+        if not profiler:
+            return None
+        try:
+            artifacts = profiler.stop()
+        except Exception:
+            logger.exception(f"Failed to save profile for job {profiler.job_id}")
+            return []
+        print(f"Profile saved to {profiler.directory}")
+        return artifacts
     @sync_to_async
     def update_status(self, status_obj, **fields):
         for key, value in fields.items():
@@ -88,46 +139,128 @@ class Command(BaseCommand):
 
     @sync_to_async
     def bulk_insert_movies(self, batch):
-        existing_titles = set(Movie.objects.filter(title__in=[m.title for m in batch]).values_list('title', flat=True))
-
-        to_update = [m for m in batch if m.title in existing_titles]
-        to_create = [m for m in batch if m.title not in existing_titles]
-
-        if to_create:
-            Movie.objects.bulk_create(to_create, ignore_conflicts=True)
-
-        if to_update:
-            # Fetch the existing objects
-            existing_movies = {m.title: m for m in Movie.objects.filter(title__in=[m.title for m in to_update])}
-            for m in to_update:
-                existing = existing_movies.get(m.title)
-                if existing:
-                    existing.year = m.year
-                    existing.rating = m.rating
-                    existing.directors = m.directors
-                    existing.cast = m.cast
-                    existing.plot = m.plot
-            Movie.objects.bulk_update(existing_movies.values(), ['year', 'rating', 'directors', 'cast', 'plot'])
+        # Pages that rendered without a title can't be stored; skip them like
+        # failed fetches rather than failing the rest of the batch.
+        skipped = [m for m in batch if not m.title]
+        if skipped:
+            logger.warning(f"Skipping {len(skipped)} scraped movie(s) without a title")
+        # Later duplicates of a title or IMDb id win, matching the update path below.
+        batch = list({m.title: m for m in batch if m.title}.values())
+        batch = list({m.imdb_id or m.title: m for m in batch}.values())
+        if not batch:
+            return
+        try:
+            self.write_batch(batch)
+        except ConcurrentInsert:
+            # The batch was rolled back; retrying sends those rows to the update path.
+            self.write_batch(batch)
+
+    def write_batch(self, batch):
+        delta = StatsDelta()
+        with transaction.atomic():
+            existing_movies = list(Movie.objects.filter(
+                Q(title__in=[m.title for m in batch]) |
+                Q(imdb_id__in=[m.imdb_id for m in batch if m.imdb_id])
+            ))
+            by_title = {m.title: m for m in existing_movies}
+            by_imdb_id = {m.imdb_id: m for m in existing_movies if m.imdb_id}
+
+            # by_title/by_imdb_id track who holds each key as the batch is
+            # applied, including renames and rows about to be created.
+            to_create = []
+            to_update = {}
+            renamed = False
+            for m in batch:
+                # The IMDb id survives renames on IMDb, so it takes precedence over the title
+                existing = by_imdb_id.get(m.imdb_id) or by_title.get(m.title)
+                if existing is not None and (existing.pk is None or existing.pk in to_update):
+                    # Already claimed by an earlier item through its other key;
+                    # never merge two movies into one row.
+                    existing = None
+                if existing is None:
+                    if m.title in by_title or (m.imdb_id and m.imdb_id in by_imdb_id):
+                        logger.warning(f"Skipping {m.title} ({m.imdb_id}): conflicts with another movie in this batch")
+                        continue
+                    to_create.append(m)
+                    by_title[m.title] = m
+                    if m.imdb_id:
+                        by_imdb_id[m.imdb_id] = m
+                    continue
+
+                delta.remove(existing)
+                to_update[existing.pk] = existing
+                if m.title not in by_title:
+                    del by_title[existing.title]
+                    existing.title = m.title
+                    by_title[m.title] = existing
+                    renamed = True
+                if m.imdb_id and m.imdb_id != existing.imdb_id:
+                    by_imdb_id.pop(existing.imdb_id, None)
+                    existing.imdb_id = m.imdb_id
+                    by_imdb_id[m.imdb_id] = existing
+                existing.year = m.year
+                existing.rating = m.rating
+                existing.directors = m.directors
+                existing.cast = m.cast
+                existing.plot = m.plot
+
+            # Updates go first so titles freed by renames can be reused by new
+            # rows. Renames are written one row at a time, in the order they
+            # were claimed above, so no single UPDATE swaps unique titles.
+            if to_update:
+                for existing in to_update.values():
+                    delta.add(existing)
+                Movie.objects.bulk_update(
+                    to_update.values(), ['title', 'imdb_id', 'year', 'rating', 'directors', 'cast', 'plot'],
+                    batch_size=1 if renamed else None,
+                )
+
+            if to_create:
+                try:
+                    with transaction.atomic():
+                        Movie.objects.bulk_create(to_create)
+                except IntegrityError:
+                    # Only a unique-key race is worth retrying; anything else
+                    # would fail the same way again.
+                    if Movie.objects.filter(
+                        Q(title__in=[m.title for m in to_create]) |
+                        Q(imdb_id__in=[m.imdb_id for m in to_create if m.imdb_id])
+                    ).exists():
+                        raise ConcurrentInsert()
+                    raise
+                for m in to_create:
+                    delta.add(m)
+
+            if delta:
+                apply_stats_delta(delta)
 
         # Movie.objects.bulk_create(batch, ignore_conflicts=True)
 
     async def scrape_movies(self, search_type, search_value, limit,status):
 
-        search_value = search_value.strip().replace(" ", "-")
-        if search_type == "genre":
-            url = f"https://www.imdb.com/search/title/?genres={search_value}"
-        else:  # keyword
-            url = f"https://www.imdb.com/search/title/?keywords={search_value}&explore=keywords"
+        if search_type == "ids":
+            # Comma-separated IMDb ids, scraped directly without a list page
+            ids = [i.strip() for i in search_value.split(",") if i.strip()][:limit]
+            movie_links = [f"https://www.imdb.com/title/{i}/" for i in ids]
+        else:
+            search_value = search_value.strip().replace(" ", "-")
+            if search_type == "genre":
+                url = f"https://www.imdb.com/search/title/?genres={search_value}"
+            else:  # keyword
+                url = f"https://www.imdb.com/search/title/?keywords={search_value}&explore=keywords"
 
-        try:
-            movie_links = await self.fetch_movie_list_page(url, limit)
-        except Exception as e:
-            await self.update_status(status, status='error', error_message=f"Error fetching movie list: {e}")
-            raise
+            try:
+                movie_links = await self.fetch_movie_list_page(url, limit)
+            except Exception as e:
+                await self.update_status(status, status='error', error_message=f"Error fetching movie list: {e}")
+                raise
         print(f"Total movies found: {len(movie_links)}")
         movie_instances = []
         with ThreadPoolExecutor(max_workers=10) as pool:
-            futures = {pool.submit(self.scrape_movie_details, link): link for link in movie_links}
+            if self.profiler:
+                futures = {pool.submit(self.profiler.profile_call, self.scrape_movie_details, link): link for link in movie_links}
+            else:
+                futures = {pool.submit(self.scrape_movie_details, link): link for link in movie_links}
 
             for future in tqdm(as_completed(futures), total=len(futures), desc="Scraping progress"):
                 try:
@@ -141,6 +274,7 @@ class Command(BaseCommand):
 
                 movie = Movie(
                     title=movie_data['title'],
+                    imdb_id=movie_data['imdb_id'],
                     year=movie_data['year'],
                     rating=float(movie_data['rating']) if movie_data['rating'] else None,
                     directors=movie_data['directors'],
@@ -159,7 +293,12 @@ class Command(BaseCommand):
         if len(movie_links) == 0:
             await self.update_status(status, status='error', error_message="No movies found")
             return
-        await self.update_status(status, status='completed', scraped_movies=len(movie_links))
+        fields = {'status': 'completed', 'scraped_movies': len(movie_links)}
+        artifacts = self.finish_profiling()
+        if artifacts is not None:
+            # Saved together so pollers never see 'completed' without artifacts
+            fields['profile_artifacts'] = artifacts
+        await self.update_status(status, **fields)
     async def fetch_movie_list_page(self, url,limit):
         try:
             all_links = []
@@ -257,9 +396,11 @@ class Command(BaseCommand):
                         break
 
             cast = self.get_credits_details(soup, 'Stars')
+            imdb_id = IMDB_ID_RE.search(movie_url)
 
             return {
                 'title': title,
+                'imdb_id': imdb_id.group(1) if imdb_id else None,
                 'year': release_year,
                 'rating': imdb_rating,
                 'directors': directors,